@@ -1,11 +1,14 @@
 import express from 'express';
 import cors from 'cors';
+import compression from 'compression';
 import { spawn } from 'child_process';
 
 const app = express();
 const PORT = 3000;
+const BRIDGE_VERSION = '1.0.0';
 
 app.use(cors());
+app.use(compression());
 app.use(express.json());
 
 // ============================================================================
@@ -134,7 +137,7 @@ class MCPSession {
       capabilities: {},
       clientInfo: {
         name: 'multi-mcp-bridge',
-        version: '1.0.0'
+        version: BRIDGE_VERSION
       }
     });
     
@@ -156,6 +159,7 @@ class MCPSession {
 app.get('/health', (req, res) => {
   res.json({ 
     status: 'ok',
+    version: BRIDGE_VERSION,
     availableServers: Object.keys(MCP_SERVERS),
     activeSessions: sessions.size
   });
@@ -248,6 +252,35 @@ app.post('/session/:sessionId/tools/call', async (req, res) => {
   }
 });
 
+// Call several tools in one request; results are aligned with invocations
+app.post('/session/:sessionId/tools/batch', async (req, res) => {
+  try {
+    const { sessionId } = req.params;
+    const { invocations } = req.body;
+    const session = sessions.get(sessionId);
+    
+    if (!session) {
+      return res.status(404).json({ error: 'Session not found' });
+    }
+    
+    if (!Array.isArray(invocations)) {
+      return res.status(400).json({ error: 'Invocations array required' });
+    }
+    
+    const results = await Promise.all(invocations.map(({ name, arguments: args }) =>
+      session.sendRequest('tools/call', {
+        name: name,
+        arguments: args || {}
+      }).catch((error) => ({ error: error.message }))
+    ));
+    
+    res.json({ results: results });
+    
+  } catch (error) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
 // Close a session
 app.post('/session/:sessionId/close', (req, res) => {
   try {
@@ -307,6 +340,7 @@ app.listen(PORT, '0.0.0.0', () => {
   console.log('   POST /session/create              - Create session (body: {server: "name"})');
   console.log('   POST /session/:id/tools/list      - List tools');
   console.log('   POST /session/:id/tools/call      - Call tool');
+  console.log('   POST /session/:id/tools/batch     - Call several tools');
   console.log('   POST /session/:id/close           - Close session');
   console.log('   GET  /session/:id/info            - Session info');
   console.log('');
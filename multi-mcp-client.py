@@ -1,5 +1,80 @@
 import requests
+import hashlib
 import json
+import os
+import re
+import threading
+import time
+import orjson
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+OLLAMA_URL = "http://localhost:11434"
+
+# Tool schemas are cached per server and bridge version
+TOOLS_CACHE_DIR = os.path.expanduser("~/.cache/mcp_init")
+TOOLS_CACHE_MAX_AGE = 24 * 60 * 60
+_SAFE_NAME_RE = re.compile(r'[\w.-]+')
+
+
+# Built once and shared by every session's adapter. allowed_methods stays at
+# the urllib3 default so POSTs (tool runs, chats) are only retried on connect
+# errors and never re-executed after a read error or timeout.
+RETRY = Retry(
+    total=3,
+    connect=2,
+    read=1,
+    backoff_factor=0.15,
+    status_forcelist=(429, 502, 503, 504)
+)
+
+
+def make_session():
+    """Create a pooled HTTP session with keep-alive and light retries"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=RETRY)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Content-Type': 'application/json',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+
+# Parallel tool calls per turn; must not exceed the adapter's pool_maxsize
+MAX_TOOL_WORKERS = 8
+
+# Upper bound on LLM calls per user prompt
+MAX_ITERATIONS = 10
+
+# Tool outputs from earlier turns are cut down to this many characters
+MAX_TOOL_RESULT_CHARS = 2048
+
+# Once history passes MAX_HISTORY_MESSAGES, everything but the most recent
+# KEEP_RECENT_MESSAGES is folded into a single summary message
+MAX_HISTORY_MESSAGES = 40
+KEEP_RECENT_MESSAGES = 20
+SUMMARY_SNIPPET_CHARS = 200
+MAX_SUMMARY_LINES = 60
+SUMMARY_PREFIX = "Prior context summary:\n"
+
+# Speculative sampling fires one Ollama request per temperature and keeps the
+# first usable reply. Only enable it when the GPU has headroom for parallel
+# generations, e.g. MCP_SPECULATIVE=1 with OLLAMA_NUM_PARALLEL >= 2.
+SPECULATIVE = os.environ.get('MCP_SPECULATIVE') == '1'
+SPECULATIVE_TEMPERATURES = (0.2, 0.8)
+
+# Tool results safe to reuse, mapped to their TTL in seconds.
+# Tools not listed here are never cached.
+CACHEABLE_TOOLS = {
+    'nmap_scan': 600,
+}
+
+# Shared Ollama session so every chat reuses the same connection
+ollama_session = make_session()
 
 class MCPBridge:
     """
@@ -8,6 +83,10 @@ class MCPBridge:
     Usage:
         bridge = MCPBridge("http://192.168.1.100:3000")
         
+        # Or as a context manager, closing the pooled connections on exit
+        with MCPBridge("http://192.168.1.100:3000") as bridge:
+            ...
+        
         # List available servers
         servers = bridge.list_servers()
         
@@ -26,57 +105,245 @@ class MCPBridge:
     
     def __init__(self, bridge_url):
         self.bridge_url = bridge_url.rstrip('/')
+        self._session = make_session()
+        self._session_servers = {}
+        self._tool_cache = {}
+        self._batch_supported = None
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
     
-    def health(self):
+    def close(self):
+        """Close pooled connections to the bridge"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def health(self, timeout=5):
         """Check bridge health and get status"""
-        response = requests.get(f"{self.bridge_url}/health")
+        response = self._session.get(f"{self.bridge_url}/health", timeout=timeout)
         return response.json()
     
-    def list_servers(self):
+    def list_servers(self, timeout=5):
         """List all available MCP servers"""
-        response = requests.get(f"{self.bridge_url}/servers")
+        response = self._session.get(f"{self.bridge_url}/servers", timeout=timeout)
         return response.json()['servers']
     
     def create_session(self, server_name):
         """Create a new session for a specific MCP server"""
-        response = requests.post(
+        response = self._session.post(
             f"{self.bridge_url}/session/create",
-            json={'server': server_name}
+            data=orjson.dumps({'server': server_name})
         )
         data = response.json()
+        self._session_servers[data['sessionId']] = server_name
         return data['sessionId']
     
     def list_tools(self, session_id):
         """List tools available in a session"""
-        response = requests.post(
+        response = self._session.post(
             f"{self.bridge_url}/session/{session_id}/tools/list"
         )
         data = response.json()
         return data.get('result', {}).get('tools', [])
     
-    def call_tool(self, session_id, tool_name, arguments, timeout=600):
-        """Call a tool in a session"""
-        response = requests.post(
+    def _cache_key(self, session_id, tool_name, arguments):
+        return (
+            self._session_servers.get(session_id, session_id),
+            tool_name,
+            orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+        )
+    
+    def _cache_get(self, key, quiet=False):
+        cached = self._tool_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            if not quiet:
+                print(f"    ↺ {key[1]}: cache hit")
+            return cached[1]
+        if not quiet:
+            print(f"    · {key[1]}: cache miss")
+        return None
+    
+    def _cache_put(self, key, result):
+        # Only successful results are worth reusing; MCP reports failed tool
+        # runs as a result with isError set
+        if 'result' in result and not result['result'].get('isError'):
+            self._tool_cache[key] = (time.monotonic() + CACHEABLE_TOOLS[key[1]], result)
+    
+    def call_tool(self, session_id, tool_name, arguments, timeout=600, use_cache=True):
+        """
+        Call a tool in a session.
+        
+        Results for CACHEABLE_TOOLS are reused until their TTL expires, and
+        concurrent identical calls share a single in-flight request.
+        """
+        if not (use_cache and tool_name in CACHEABLE_TOOLS):
+            return self._post_tool_call(session_id, tool_name, arguments, timeout)
+        
+        key = self._cache_key(session_id, tool_name, arguments)
+        while True:
+            with self._inflight_lock:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    return cached
+                future = self._inflight.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = self._inflight[key] = Future()
+            
+            if is_owner:
+                break
+            print(f"    ⇄ {tool_name}: joined in-flight call")
+            result = future.result()
+            # None means the owner gave up without a result; try again
+            if result is not None:
+                return result
+        
+        try:
+            result = self._post_tool_call(session_id, tool_name, arguments, timeout)
+            self._cache_put(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def _post_tool_call(self, session_id, tool_name, arguments, timeout):
+        response = self._session.post(
             f"{self.bridge_url}/session/{session_id}/tools/call",
-            json={'name': tool_name, 'arguments': arguments},
+            data=orjson.dumps({'name': tool_name, 'arguments': arguments}),
             timeout=timeout
         )
-        return response.json()
+        # Tool output can be large; parse the decompressed bytes directly
+        return orjson.loads(response.content)
     
-    def get_session_info(self, session_id):
+    def call_tools_batch(self, session_id, calls, timeout=600):
+        """
+        Call several cacheable tools in one bridge round-trip.
+        
+        calls is a list of (tool_name, arguments). Identical calls, and calls
+        already in flight elsewhere, are only run once. Returns results aligned
+        with calls, or None if the bridge has no batch endpoint or the batch
+        request failed, in which case the caller should fall back to call_tool.
+        """
+        if self._batch_supported is False:
+            return None
+        
+        keys = [self._cache_key(session_id, name, args) for name, args in calls]
+        resolved = {}
+        hits = set()
+        owned = {}
+        joined = {}
+        with self._inflight_lock:
+            for i, key in enumerate(keys):
+                if key in resolved or key in owned or key in joined:
+                    continue
+                # Looked up quietly: if the batch fails, call_tool repeats the
+                # lookup and would print every hit and miss twice
+                cached = self._cache_get(key, quiet=True)
+                if cached is not None:
+                    resolved[key] = cached
+                    hits.add(key)
+                elif key in self._inflight:
+                    joined[key] = self._inflight[key]
+                else:
+                    owned[key] = (calls[i], Future())
+                    self._inflight[key] = owned[key][1]
+        
+        batch = None
+        try:
+            if owned:
+                batch = self._post_batch(
+                    session_id, [call for call, _ in owned.values()], timeout
+                )
+            if batch is not None:
+                for key, result in zip(owned, batch):
+                    self._cache_put(key, result)
+                    resolved[key] = result
+        finally:
+            # Waiters that get None retry on their own
+            with self._inflight_lock:
+                for key, (_, future) in owned.items():
+                    future.set_result(resolved.get(key))
+                    self._inflight.pop(key, None)
+        
+        if owned and batch is None:
+            return None
+        
+        for key, future in joined.items():
+            try:
+                result = future.result()
+            except Exception:
+                return None
+            if result is None:
+                return None
+            resolved[key] = result
+        
+        for key in resolved:
+            if key in hits:
+                print(f"    ↺ {key[1]}: cache hit")
+            else:
+                print(f"    · {key[1]}: cache miss")
+        return [resolved[key] for key in keys]
+    
+    def _post_batch(self, session_id, calls, timeout):
+        response = self._session.post(
+            f"{self.bridge_url}/session/{session_id}/tools/batch",
+            data=orjson.dumps({'invocations': [
+                {'name': name, 'arguments': args} for name, args in calls
+            ]}),
+            timeout=timeout
+        )
+        if response.status_code == 404 and self._batch_supported is None:
+            # Only an older bridge without the endpoint is remembered; an
+            # unknown session is reported properly by the per-call fallback
+            try:
+                session_missing = orjson.loads(response.content).get('error') == 'Session not found'
+            except (orjson.JSONDecodeError, AttributeError):
+                session_missing = False
+            if not session_missing:
+                self._batch_supported = False
+            return None
+        
+        # Any other failure falls back to per-call dispatch, which reports
+        # errors to the model as tool messages
+        try:
+            batch = orjson.loads(response.content).get('results') if response.ok else None
+        except (orjson.JSONDecodeError, AttributeError):
+            batch = None
+        if not isinstance(batch, list) or len(batch) != len(calls):
+            return None
+        self._batch_supported = True
+        return batch
+    
+    def sweep_cache(self):
+        """Drop expired tool results from the cache"""
+        now = time.monotonic()
+        for key, (expires, _) in list(self._tool_cache.items()):
+            if expires <= now:
+                self._tool_cache.pop(key, None)
+    
+    def get_session_info(self, session_id, timeout=5):
         """Get information about a session"""
-        response = requests.get(f"{self.bridge_url}/session/{session_id}/info")
+        response = self._session.get(f"{self.bridge_url}/session/{session_id}/info", timeout=timeout)
         return response.json()
     
     def close_session(self, session_id):
         """Close a session"""
-        response = requests.post(f"{self.bridge_url}/session/{session_id}/close")
+        response = self._session.post(f"{self.bridge_url}/session/{session_id}/close")
+        self._session_servers.pop(session_id, None)
         return response.json()
 
 
 def format_tools_for_qwen(mcp_tools):
     """Convert MCP tool format to Qwen/Ollama format"""
-    return [
+    return list(
         {
             "type": "function",
             "function": {
@@ -86,157 +353,437 @@ def format_tools_for_qwen(mcp_tools):
             }
         }
         for tool in mcp_tools
-    ]
+    )
 
 
-def chat_with_qwen(messages, tools, model="qwen2.5:7b"):
-    """Send request to local Qwen via Ollama"""
-    payload = {
+def _load_or_fetch_tools(bridge, session_id, server_name, version):
+    """
+    Return (mcp_tools, qwen_tools), served from the on-disk cache when fresh.
+    
+    The cache is keyed by bridge URL, server and version, and is skipped
+    entirely if the bridge doesn't report a version safe to use in a filename.
+    """
+    if not all(_SAFE_NAME_RE.fullmatch(str(part or '')) for part in (server_name, version)):
+        mcp_tools = bridge.list_tools(session_id)
+        return mcp_tools, format_tools_for_qwen(mcp_tools)
+    
+    bridge_id = hashlib.sha256(bridge.bridge_url.encode()).hexdigest()[:12]
+    path = os.path.join(TOOLS_CACHE_DIR, f"tools_{bridge_id}_{server_name}_{version}.json")
+    try:
+        if time.time() - os.path.getmtime(path) < TOOLS_CACHE_MAX_AGE:
+            with open(path, 'rb') as f:
+                cached = orjson.loads(f.read())
+            return cached['tools'], cached['qwen_tools']
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    mcp_tools = bridge.list_tools(session_id)
+    qwen_tools = format_tools_for_qwen(mcp_tools)
+    
+    # Write to a temp file and swap it in so readers never see a partial file
+    try:
+        os.makedirs(TOOLS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps({'tools': mcp_tools, 'qwen_tools': qwen_tools}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not cache tool list: {e}")
+    
+    return mcp_tools, qwen_tools
+
+
+def make_chat_template(tools, model="qwen2.5:7b"):
+    """Build the static part of the Ollama chat payload once per session"""
+    return {
         "model": model,
-        "messages": messages,
         "tools": tools,
-        "stream": False
+        "stream": True
     }
+
+
+def compact_tool_results(messages, limit=MAX_TOOL_RESULT_CHARS):
+    """Trim earlier tool outputs to head + tail so history stays small"""
+    for msg in messages:
+        content = msg.get('content') or ''
+        if msg.get('role') != 'tool' or len(content) <= limit:
+            continue
+        # Budget the marker itself so the result fits in limit and is never
+        # truncated again on a later turn
+        marker_size = len(f"\n... [{len(content)} chars truncated] ...\n")
+        keep = max(limit - marker_size, 0)
+        head = keep // 2
+        tail = keep - head
+        marker = f"\n... [{len(content) - keep} chars truncated] ...\n"
+        msg['content'] = content[:head] + marker + (content[-tail:] if tail else '')
+
+
+def _is_summary(msg):
+    return msg.get('role') == 'system' and (msg.get('content') or '').startswith(SUMMARY_PREFIX)
+
+
+def rotate_history(messages, max_messages=MAX_HISTORY_MESSAGES, keep_recent=KEEP_RECENT_MESSAGES):
+    """
+    Bound the history resent to Ollama on every call.
     
-    response = requests.post("http://localhost:11434/api/chat", json=payload, timeout=60)
-    return response.json()
+    Keeps a leading system prompt and the recent window, and replaces the
+    messages in between with a heuristic summary. An earlier summary is merged
+    into the new one rather than nested. The window always starts at a user
+    message so tool results are never separated from their call.
+    """
+    if len(messages) <= max_messages:
+        return
+    
+    head = messages[:1] if messages[0].get('role') == 'system' and not _is_summary(messages[0]) else []
+    user_turns = [
+        i for i, msg in enumerate(messages)
+        if i > len(head) and msg.get('role') == 'user'
+    ]
+    target = len(messages) - keep_recent
+    later = [i for i in user_turns if i >= target]
+    earlier = [i for i in user_turns if i < target]
+    if later:
+        cut = later[0]
+    elif earlier:
+        cut = earlier[-1]
+    else:
+        return
+    
+    lines = []
+    for msg in messages[len(head):cut]:
+        if _is_summary(msg):
+            lines.extend(msg['content'][len(SUMMARY_PREFIX):].splitlines())
+            continue
+        text = (msg.get('content') or '').replace('\n', ' ')
+        if len(text) > SUMMARY_SNIPPET_CHARS:
+            text = text[:SUMMARY_SNIPPET_CHARS] + '...'
+        calls = ', '.join(tc['function']['name'] for tc in msg.get('tool_calls') or [])
+        if calls:
+            text = f"{text} [called: {calls}]".strip()
+        if text:
+            lines.append(f"- {msg.get('role', '?')}: {text}")
+    
+    # Drop the oldest lines first so the summary itself stays bounded
+    summary = {
+        "role": "system",
+        "content": SUMMARY_PREFIX + '\n'.join(lines[-MAX_SUMMARY_LINES:])
+    }
+    messages[:] = head + [summary] + messages[cut:]
 
 
-def main():
-    # Configuration
-    KALI_IP = "192.168.1.100"  # CHANGE THIS
-    BRIDGE_URL = f"http://{KALI_IP}:3000"
+def chat_with_qwen(messages, chat_template, options=None, echo=True, cancel=None, responses=None):
+    """
+    Send request to local Qwen via Ollama, printing tokens as they stream in.
     
-    print("🔧 Multi-MCP Pentest Assistant")
-    print("="*60)
+    chat_template comes from make_chat_template(); only messages change
+    between calls. Returns the same shape as a non-streaming call: the final
+    chunk with 'message' holding the full content and any tool_calls.
     
-    # Initialize bridge client
-    bridge = MCPBridge(BRIDGE_URL)
+    With echo=False nothing is printed. The open HTTP response is appended
+    to responses, if given, so another thread can close it to abort the
+    stream. Once the cancel event is set, None is returned.
+    """
+    payload = {**chat_template, "messages": messages}
+    if options:
+        payload["options"] = options
     
-    # Check connection
-    try:
-        health = bridge.health()
-        print(f"✅ Connected to bridge")
-        print(f"   Active sessions: {health['activeSessions']}")
-    except:
-        print(f"❌ Cannot connect to bridge at {BRIDGE_URL}")
-        print("   Make sure it's running: node multi-mcp-bridge.js")
-        return
+    content = []
+    tool_calls = []
+    final = {}
+    with ollama_session.post(f"{OLLAMA_URL}/api/chat", data=orjson.dumps(payload), stream=True, timeout=60) as response:
+        if responses is not None:
+            responses.append(response)
+        try:
+            for line in response.iter_lines():
+                if cancel is not None and cancel.is_set():
+                    return None
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                message = chunk.get('message', {})
+                
+                piece = message.get('content', '')
+                if piece:
+                    if echo:
+                        if not content:
+                            print("\n🤖 ", end='', flush=True)
+                        print(piece, end='', flush=True)
+                    content.append(piece)
+                tool_calls.extend(message.get('tool_calls') or [])
+                
+                if chunk.get('done'):
+                    final = chunk
+                    break
+        except Exception:
+            # Reading fails once another thread closes the response to cancel it
+            if cancel is not None and cancel.is_set():
+                return None
+            raise
     
-    # List available servers
-    servers = bridge.list_servers()
-    print(f"\n📋 Available MCP servers ({len(servers)}):")
-    for i, server in enumerate(servers, 1):
-        print(f"   {i}. {server['name']}: {server['description']}")
+    if echo and content:
+        print()
     
-    # Select server (for now, hardcode to 'pentest')
-    server_name = 'pentest'
-    print(f"\n🔌 Using server: {server_name}")
+    assistant_msg = {"role": "assistant", "content": ''.join(content)}
+    if tool_calls:
+        assistant_msg['tool_calls'] = tool_calls
+    final['message'] = assistant_msg
+    return final
+
+
+def _is_usable_reply(response):
+    """A reply is usable if it has a final answer or well-formed tool calls"""
+    if not response:
+        return False
+    msg = response.get('message', {})
+    tool_calls = msg.get('tool_calls')
+    if not tool_calls:
+        return bool(msg.get('content'))
     
-    # Create session
-    try:
-        session_id = bridge.create_session(server_name)
-        print(f"✅ Session created: {session_id[:20]}...")
-    except Exception as e:
-        print(f"❌ Failed to create session: {e}")
-        return
+    for tool_call in tool_calls:
+        func = tool_call.get('function') or {}
+        if not func.get('name'):
+            return False
+        arguments = func.get('arguments', {})
+        if isinstance(arguments, str):
+            try:
+                orjson.loads(arguments)
+            except orjson.JSONDecodeError:
+                return False
+    return True
+
+
+def speculative_chat(messages, chat_template, temperatures=SPECULATIVE_TEMPERATURES):
+    """
+    Sample one completion per temperature in parallel and keep the first usable one.
+    
+    The remaining responses are closed from this thread as soon as a winner
+    is picked, so their streams break immediately. A request that hasn't got
+    response headers yet stops as soon as they arrive.
+    Falls back to the last reply received if none is usable, and re-raises
+    if every request failed.
+    """
+    cancel = threading.Event()
+    responses = []
+    ex = ThreadPoolExecutor(max_workers=len(temperatures))
+    pending = {
+        ex.submit(chat_with_qwen, messages, chat_template,
+                  options={"temperature": t}, echo=False, cancel=cancel,
+                  responses=responses)
+        for t in temperatures
+    }
     
+    winner = fallback = error = None
     try:
-        # List tools
-        mcp_tools = bridge.list_tools(session_id)
-        print(f"✅ Available tools ({len(mcp_tools)}):")
-        for tool in mcp_tools:
-            desc = tool.get('description', 'No description')[:50]
-            print(f"   • {tool['name']}: {desc}...")
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                elif _is_usable_reply(future.result()):
+                    winner = future.result()
+                    break
+                else:
+                    fallback = future.result()
+    finally:
+        # Set before closing: a worker registers its response and then checks
+        # the event, so every response is either closed here or by its worker
+        cancel.set()
+        for future in pending:
+            future.cancel()
+        for response in list(responses):
+            response.close()
+        ex.shutdown(wait=False)
+    
+    if winner is None:
+        if fallback is None and error is not None:
+            raise error
+        winner = fallback or {}
+    
+    content = winner.get('message', {}).get('content')
+    if content:
+        print(f"\n🤖 {content}")
+    return winner
+
+
+def main():
+    # Configuration
+    KALI_IP = "192.168.1.100"  # CHANGE THIS
+    BRIDGE_URL = f"http://{KALI_IP}:3000"
+    
+    print("🔧 Multi-MCP Pentest Assistant")
+    print("="*60)
+    
+    # Initialize bridge client; pooled connections are closed on every exit path
+    with MCPBridge(BRIDGE_URL) as bridge:
+        # Probe the bridge and Ollama concurrently; this also opens the pooled
+        # keep-alive connections so the first real request skips the handshake
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            health_f = ex.submit(bridge.health)
+            servers_f = ex.submit(bridge.list_servers)
+            ollama_f = ex.submit(ollama_session.get, f"{OLLAMA_URL}/api/tags", timeout=2)
+        
+        # Check connection
+        try:
+            health = health_f.result()
+            print(f"✅ Connected to bridge")
+            print(f"   Active sessions: {health['activeSessions']}")
+        except:
+            print(f"❌ Cannot connect to bridge at {BRIDGE_URL}")
+            print("   Make sure it's running: node multi-mcp-bridge.js")
+            return
         
         # Check Ollama
         try:
-            requests.get("http://localhost:11434", timeout=2)
+            ollama_f.result()
             print("✅ Ollama is running")
         except:
             print("❌ Ollama not running")
             return
         
-        # Prepare for chat
-        qwen_tools = format_tools_for_qwen(mcp_tools)
-        messages = []
+        # List available servers
+        servers = servers_f.result()
+        print(f"\n📋 Available MCP servers ({len(servers)}):")
+        for i, server in enumerate(servers, 1):
+            print(f"   {i}. {server['name']}: {server['description']}")
         
-        print("\n" + "="*60)
-        print("🤖 Ready! Type 'exit' to quit, 'tools' to list tools")
-        print("="*60)
-        print()
+        # Select server (for now, hardcode to 'pentest')
+        server_name = 'pentest'
+        print(f"\n🔌 Using server: {server_name}")
         
-        # Main loop
-        while True:
-            user_input = input("You: ").strip()
-            
-            if user_input.lower() in ['exit', 'quit', 'q']:
-                break
-            
-            if user_input.lower() == 'tools':
-                for tool in mcp_tools:
-                    print(f"  • {tool['name']}")
-                continue
+        # Create session
+        try:
+            session_id = bridge.create_session(server_name)
+            print(f"✅ Session created: {session_id[:20]}...")
+        except Exception as e:
+            print(f"❌ Failed to create session: {e}")
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS)
+        
+        try:
+            # List tools
+            mcp_tools, qwen_tools = _load_or_fetch_tools(
+                bridge, session_id, server_name, health.get('version')
+            )
+            print(f"✅ Available tools ({len(mcp_tools)}):")
+            for tool in mcp_tools:
+                desc = tool.get('description', 'No description')[:50]
+                print(f"   • {tool['name']}: {desc}...")
             
-            if not user_input:
-                continue
+            # Prepare for chat
+            chat_template = make_chat_template(qwen_tools)
+            chat = speculative_chat if SPECULATIVE else chat_with_qwen
+            messages = []
             
-            messages.append({"role": "user", "content": user_input})
+            print("\n" + "="*60)
+            print("🤖 Ready! Type 'exit' to quit, 'tools' to list tools")
+            print("="*60)
+            print()
             
-            # Agentic loop
-            for iteration in range(10):
-                response = chat_with_qwen(messages, qwen_tools)
-                assistant_msg = response.get('message', {})
-                messages.append(assistant_msg)
+            # Main loop
+            while True:
+                # Housekeeping runs in the background while waiting for the user
+                pool.submit(bridge.sweep_cache)
+                user_input = input("You: ").strip()
+                
+                if user_input.lower() in ['exit', 'quit', 'q']:
+                    break
+                
+                if user_input.lower() == 'tools':
+                    for tool in mcp_tools:
+                        print(f"  • {tool['name']}")
+                    continue
                 
-                # Handle tool calls
-                if 'tool_calls' in assistant_msg and assistant_msg['tool_calls']:
+                if not user_input:
+                    continue
+                
+                compact_tool_results(messages)
+                rotate_history(messages)
+                messages.append({"role": "user", "content": user_input})
+                
+                # Agentic loop
+                for iteration in range(MAX_ITERATIONS):
+                    response = chat(messages, chat_template)
+                    assistant_msg = response.get('message', {})
+                    messages.append(assistant_msg)
+                    
+                    # No tool calls means the model gave its final answer
+                    if not assistant_msg.get('tool_calls'):
+                        # Final response was already streamed to the terminal
+                        if assistant_msg.get('content'):
+                            print()
+                        break
+                    
+                    # Handle tool calls
                     print(f"\n🔨 Executing {len(assistant_msg['tool_calls'])} tool(s)...\n")
                     
-                    for tool_call in assistant_msg['tool_calls']:
+                    tool_calls = assistant_msg['tool_calls']
+                    invocations = []
+                    for tool_call in tool_calls:
                         func = tool_call['function']
                         tool_name = func['name']
                         
                         # Parse arguments
                         if isinstance(func['arguments'], str):
-                            tool_args = json.loads(func['arguments'])
+                            tool_args = orjson.loads(func['arguments'])
                         else:
                             tool_args = func['arguments']
                         
                         print(f"  → {tool_name}")
                         print(f"    {json.dumps(tool_args, indent=4)}")
-                        
-                        # Call tool via bridge
-                        result = bridge.call_tool(session_id, tool_name, tool_args)
-                        
+                        invocations.append((tool_name, tool_args))
+                    
+                    # Call tools via bridge: one batch request when every call is
+                    # cacheable, otherwise in parallel when there are several
+                    results = None
+                    if len(invocations) > 1 and all(
+                        tool_name in CACHEABLE_TOOLS for tool_name, _ in invocations
+                    ):
+                        results = bridge.call_tools_batch(session_id, invocations)
+                    
+                    if results is None and len(invocations) > 1:
+                        futures = [
+                            pool.submit(bridge.call_tool, session_id, tool_name, tool_args)
+                            for tool_name, tool_args in invocations
+                        ]
+                        results = (future.result() for future in futures)
+                    elif results is None:
+                        results = (
+                            bridge.call_tool(session_id, tool_name, tool_args)
+                            for tool_name, tool_args in invocations
+                        )
+                    
+                    # Results are collected in the original tool_call order
+                    for (tool_name, _), result in zip(invocations, results):
                         # Extract content from result
                         if 'result' in result:
                             content = result['result'].get('content', [])
-                            result_text = '\n'.join([
-                                item.get('text', str(item)) 
-                                for item in content
-                            ])
+                            # Single text item is by far the most common shape
+                            if len(content) == 1 and 'text' in content[0]:
+                                result_text = content[0]['text']
+                            else:
+                                result_text = '\n'.join(
+                                    item['text'] if 'text' in item else str(item)
+                                    for item in content
+                                )
                         else:
-                            result_text = json.dumps(result)
+                            result_text = orjson.dumps(result).decode()
                         
-                        print(f"    ✓ Done\n")
+                        print(f"    ✓ {tool_name} done")
                         
                         messages.append({
                             "role": "tool",
                             "content": result_text
                         })
-                    
-                    continue
-                
-                # Show final response
-                if 'content' in assistant_msg and assistant_msg['content']:
-                    print(f"\n🤖 {assistant_msg['content']}\n")
-                break
-    
-    finally:
-        # Cleanup
-        bridge.close_session(session_id)
-        print("\n👋 Session closed")
+                    print()
+                else:
+                    print(f"\n⚠️  Stopped after {MAX_ITERATIONS} iterations without a final answer\n")
+        
+        finally:
+            # Cleanup
+            pool.shutdown(wait=False)
+            bridge.close_session(session_id)
+            print("\n👋 Session closed")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
 import requests
+import atexit
 import json
+import orjson
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from rich import print
 
 CONFIG_FILE = "config.json"
@@ -9,6 +16,40 @@ LOG_DIR = "logs"
 
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# One append-only NDJSON file per process; the 64 KB buffer batches writes
+# and is flushed when the file is closed at exit
+LOG_FILE = os.path.join(LOG_DIR, f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson")
+_log_fh = open(LOG_FILE, "ab", buffering=64 * 1024)
+atexit.register(_log_fh.close)
+
+
+# allowed_methods stays at the urllib3 default so POSTs are only retried on
+# connect errors and never re-executed after a read error or timeout.
+RETRY = Retry(
+    total=3,
+    connect=2,
+    read=1,
+    backoff_factor=0.15,
+    status_forcelist=(429, 502, 503, 504)
+)
+
+
+def make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=RETRY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Connection": "keep-alive"
+    })
+    return session
+
+
+# Reused across calls so Ollama and MCP servers keep connections alive
+http = make_session()
+
 
 def load_config():
     with open(CONFIG_FILE, "r") as f:
@@ -16,10 +57,7 @@ def load_config():
 
 
 def log_event(data):
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(LOG_DIR, f"log_{ts}.json")
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    _log_fh.write(orjson.dumps({"ts": datetime.now().isoformat(), **data}) + b"\n")
 
 
 def call_ollama(prompt, config, tools=None):
@@ -29,11 +67,30 @@ def call_ollama(prompt, config, tools=None):
             {"role": "system", "content": "You are a pentest assistant. Use tools when needed."},
             {"role": "user", "content": prompt}
         ],
-        "stream": False
+        "stream": True
     }
 
-    response = requests.post(config["ollama"]["url"], json=payload)
-    return response.json()
+    # Stream tokens to the terminal and rebuild the non-streaming response shape
+    content = []
+    final = {}
+    with http.post(config["ollama"]["url"], data=orjson.dumps(payload), stream=True) as response:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            piece = chunk.get("message", {}).get("content", "")
+            if piece:
+                # Raw write so rich doesn't interpret markup in model output
+                sys.stdout.write(piece)
+                sys.stdout.flush()
+                content.append(piece)
+            if chunk.get("done"):
+                final = chunk
+                break
+
+    print()
+    final["message"] = {"role": "assistant", "content": "".join(content)}
+    return final
 
 
 def call_mcp_tool(server_url, tool_name, args):
@@ -41,12 +98,54 @@ def call_mcp_tool(server_url, tool_name, args):
         "tool": tool_name,
         "arguments": args
     }
-    r = requests.post(server_url, json=payload, timeout=300)
+    r = http.post(server_url, data=orjson.dumps(payload), timeout=300)
     return r.json()
 
 
+_TOOL_RE = re.compile(r"TOOL_CALL:\s*(\{)")
+
+
+def _find_object_end(text, start):
+    """Return the index just past the JSON object opening at text[start], or -1"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def find_tool_calls(content):
+    """Yield the raw JSON of every TOOL_CALL: {...} in an LLM reply"""
+    # Each search resumes after the previous object, so markers inside its
+    # string values are never matched and the reply is scanned once
+    m = _TOOL_RE.search(content)
+    while m:
+        end = _find_object_end(content, m.start(1))
+        if end == -1:
+            break
+        yield content[m.start(1):end]
+        m = _TOOL_RE.search(content, end)
+
+
 def main():
     config = load_config()
+    pool = ThreadPoolExecutor(max_workers=8)
 
     print("[bold green]MCP CLI Orchestrator started[/bold green]")
 
@@ -55,42 +154,55 @@ def main():
         if user_input.lower() in ["exit", "quit"]:
             break
 
-        # Step 1: ask LLM
+        # Step 1: ask LLM (response is streamed as it arrives)
+        print("\n[cyan]LLM:[/cyan] ", end="")
         llm_response = call_ollama(user_input, config)
 
         message = llm_response.get("message", {})
         content = message.get("content", "")
 
-        print(f"\n[cyan]LLM:[/cyan] {content}")
-
         log_data = {
             "input": user_input,
             "llm": llm_response
         }
 
-        # Very simple tool call detection
-        if "TOOL_CALL" in content:
+        # Run every tool call in the reply, in parallel
+        jobs = []
+        for raw in find_tool_calls(content):
             try:
-                tool_data = json.loads(content.split("TOOL_CALL:")[1].strip())
+                tool_data = orjson.loads(raw)
                 server = tool_data["server"]
                 tool = tool_data["tool"]
                 args = tool_data.get("args", {})
 
                 server_url = config["servers"][server]["url"]
+            except Exception as e:
+                print(f"[red]Tool call failed:[/red] {e}")
+                continue
 
-                print(f"[yellow]Running tool:[/yellow] {tool} on {server}")
-                result = call_mcp_tool(server_url, tool, args)
-
-                print("[magenta]Tool result:[/magenta]")
-                print(result)
-
-                log_data["tool_result"] = result
+            print(f"[yellow]Running tool:[/yellow] {tool} on {server}")
+            jobs.append(pool.submit(call_mcp_tool, server_url, tool, args))
 
+        tool_results = []
+        for job in jobs:
+            try:
+                result = job.result()
             except Exception as e:
                 print(f"[red]Tool call failed:[/red] {e}")
+                continue
+
+            print("[magenta]Tool result:[/magenta]")
+            print(result)
+            tool_results.append(result)
+
+        if tool_results:
+            log_data["tool_results"] = tool_results
 
         log_event(log_data)
 
+    pool.shutdown()
+    http.close()
+
 
 if __name__ == "__main__":
     main()
@@ -8,7 +8,8 @@ cat > package.json << 'EOF'
   "version": "1.0.0",
   "dependencies": {
     "express": "^4.18.2",
-    "cors": "^2.8.5"
+    "cors": "^2.8.5",
+    "compression": "^1.7.4"
   }
 }
 EOF